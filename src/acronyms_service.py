@@ -2,142 +2,411 @@
 """
 
 import asyncio
-import json
+import bisect
+import contextlib
+import functools
+import hashlib
+import heapq
 import logging
 import os
+import pickle
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, NamedTuple, Optional
 
+import numpy as np
+import orjson
 from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+from watchfiles import awatch
 
 logger = logging.getLogger(__name__)
 
+# Minimum score for candidates that contain the query as a substring
+PARTIAL_MATCH_THRESHOLD = 60.0
 
-class AcronymsService:
-    """Service for searching acronyms with fuzzy matching and file watching."""
+# Queries shorter than this (after stripping whitespace) return no results
+MIN_QUERY_LENGTH = 2
+
+# Scores assigned by the exact/prefix term lookup, which bypasses fuzzy scoring
+EXACT_MATCH_SCORE = 100.0
+PREFIX_MATCH_SCORE = 95.0
+
+# Maximum number of (query, threshold, limit) result lists kept per loaded index
+RESULTS_CACHE_SIZE = 1024
+
+# search() re-checks the glossary file at most this often (seconds), watcher or not
+FILE_CHECK_INTERVAL = 0.5
+
+# Substring candidates for queries at least this long come from an n-gram inverted index
+NGRAM_SIZE = 3
+
+
+def _ngrams(text: str) -> set[str]:
+    """Return the distinct NGRAM_SIZE-character windows of text."""
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def _char_mask(text: str) -> int:
+    """64-bit set of the characters in text (bit ord(c) % 64 per character)."""
+    mask = 0
+    for char in set(text):
+        mask |= 1 << (ord(char) & 63)
+    return mask
+
+
+def _read_fd(fd: int, size: int) -> bytes:
+    """Read an open file descriptor to EOF.
+
+    Plain reads rather than mmap: editors truncate the file while saving in place, and
+    touching a truncated mapping kills the process with SIGBUS. A short read only
+    produces a JSON error, and the next change event reloads the finished file.
+    """
+    chunks = []
+    while chunk := os.read(fd, max(size, 65536)):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+class _SearchIndex(NamedTuple):
+    """Immutable point-in-time view of the loaded acronyms and their lookup structures."""
+
+    data: list[dict[str, Any]]
+    search_strings: tuple[str, ...]
+    exact_index: dict[str, list[int]]
+    sorted_terms: list[tuple[str, int]]
+    ngram_index: dict[str, frozenset[int]]
+    char_masks: np.ndarray
+
+
+def _build_index(data: list[dict[str, Any]]) -> _SearchIndex:
+    """Build all search structures for a list of acronyms."""
+    # One "term full_name" string per item, built and normalized (lowercase, punctuation
+    # stripped) once per load so the scorer runs with processor=None on every query
+    search_strings = tuple(default_process(f"{item.get('term', '')} {item.get('full_name', '')}") for item in data)
+
+    # Lowercased term -> item indices for exact lookups, plus a sorted list for prefix bisection
+    exact_index: dict[str, list[int]] = {}
+    for idx, item in enumerate(data):
+        exact_index.setdefault(item.get("term", "").lower(), []).append(idx)
+    sorted_terms = sorted((term, idx) for term, ids in exact_index.items() if term for idx in ids)
+
+    # n-gram -> indices of the search strings containing it, for substring candidate lookup
+    ngram_postings: dict[str, set[int]] = {}
+    for idx, search_str in enumerate(search_strings):
+        for gram in _ngrams(search_str):
+            ngram_postings.setdefault(gram, set()).add(idx)
+    ngram_index = {gram: frozenset(ids) for gram, ids in ngram_postings.items()}
+
+    # Per-string character bitmaps: prefilter for queries too short for the n-gram index
+    char_masks = np.fromiter(
+        (_char_mask(search_str) for search_str in search_strings), dtype=np.uint64, count=len(search_strings)
+    )
+
+    return _SearchIndex(data, search_strings, exact_index, sorted_terms, ngram_index, char_masks)
+
+
+_EMPTY_INDEX = _build_index([])
+
+
+# Bump whenever _SearchIndex or _build_index changes so stale index caches are ignored
+_INDEX_CACHE_FORMAT = 2
+
+
+def _index_cache_path(file_path: str) -> Optional[Path]:
+    """Index cache location for a glossary file in INDEX_CACHE_DIR, or None when caching is off.
+
+    The cache is a pickle, so it lives in a directory the app owns rather than next to the
+    glossary: anyone able to write the cache file could run code at startup.
+    """
+    cache_dir = os.getenv("INDEX_CACHE_DIR")
+    if not cache_dir:
+        return None
+    return Path(cache_dir) / Path(file_path).with_suffix(".cache.pkl").name
+
+
+def _load_cached_index(cache_path: Path, cache_key: tuple[int, bytes]) -> Optional[_SearchIndex]:
+    """Load a pickled index if it was built from the same glossary file version."""
+    try:
+        with open(cache_path, "rb") as f:
+            key, index = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable index cache {cache_path}: {e}")
+        return None
+    return index if key == cache_key else None
+
+
+def _store_cached_index(cache_path: Path, cache_key: tuple[int, bytes], index: _SearchIndex) -> None:
+    """Write the index cache atomically; failures (e.g. read-only volume) only cost the next cold start."""
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump((cache_key, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.debug(f"Could not write index cache {cache_path}: {e}")
+    finally:
+        # Gone already after a successful replace
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+
+
+def _read_index(fd: int, st: os.stat_result, file_path: str) -> _SearchIndex:
+    """Parse the glossary from an open file and build its search index.
+
+    With INDEX_CACHE_DIR set, a pickled cache keyed on a hash of the file's content
+    skips JSON parsing and index building on cold starts. Size and mtime are not
+    enough: a replacement with preserved timestamps (cp -p, rsync -t, reproducible
+    builds) would serve a stale index. Blocking; load_data runs it in a worker thread.
+    """
+    raw = _read_fd(fd, st.st_size)
+    cache_path = _index_cache_path(file_path)
+    if cache_path is not None:
+        cache_key = (_INDEX_CACHE_FORMAT, hashlib.blake2b(raw, digest_size=16).digest())
+        cached = _load_cached_index(cache_path, cache_key)
+        if cached is not None:
+            return cached
 
-    _instance: Optional["AcronymsService"] = None
-    _lock = asyncio.Lock()
+    content = orjson.loads(raw)
+    # Handle both formats: {"acronyms": [...]} or direct list
+    if isinstance(content, dict) and "acronyms" in content:
+        index = _build_index(content["acronyms"])
+    elif isinstance(content, list):
+        index = _build_index(content)
+    else:
+        logger.error(f"Invalid JSON format in {file_path}")
+        return _EMPTY_INDEX
 
-    def __new__(cls, file_path: Optional[str] = None):
-        """Implement singleton pattern."""
-        # For testing, allow creating new instances with different file paths
-        if file_path and (
-            cls._instance is None or (hasattr(cls._instance, "file_path") and cls._instance.file_path != file_path)
-        ):
-            cls._instance = super().__new__(cls)
-        elif cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    if cache_path is not None:
+        _store_cached_index(cache_path, cache_key, index)
+    return index
+
+
+class AcronymsService:
+    """Service for searching acronyms with fuzzy matching and file watching."""
 
     def __init__(self, file_path: Optional[str] = None):
         """Initialize the service with file path."""
-        # Reset if file path has changed (for testing)
-        if hasattr(self, "initialized") and file_path and self.file_path != file_path:
-            self.initialized = False
+        self.file_path = file_path or os.getenv("GLOSSARY_FILE_PATH", "siemens_acronyms.json")
+        self._index = _EMPTY_INDEX
+        self._file_key: Optional[tuple[int, int]] = None
+        self._last_file_check = float("-inf")
+        self._lock = asyncio.Lock()
+        self._results_cache: OrderedDict[tuple[str, float, int], list[dict[str, Any]]] = OrderedDict()
+        logger.info(f"AcronymsService initialized with file: {self.file_path}")
 
-        if not hasattr(self, "initialized"):
-            self.file_path = file_path or os.getenv("GLOSSARY_FILE_PATH", "siemens_acronyms.json")
-            self.data: list[dict[str, Any]] = []
-            self.last_mtime: Optional[float] = None
-            self.initialized = True
-            logger.info(f"AcronymsService initialized with file: {self.file_path}")
+    @property
+    def data(self) -> list[dict[str, Any]]:
+        """Currently loaded acronyms."""
+        return self._index.data
 
     async def load_data(self) -> None:
-        """Load or reload data from JSON file if it has changed."""
-        try:
-            file_path = Path(self.file_path)
+        """Load or reload data from JSON file if it has changed.
 
+        The file is parsed and indexed in a worker thread without holding the lock;
+        the lock only covers swapping in the finished snapshot.
+        """
+        try:
             # Check if file exists
-            if not file_path.exists():
+            try:
+                fd = os.open(self.file_path, os.O_RDONLY)
+            except FileNotFoundError:
                 logger.warning(f"Acronyms file not found: {self.file_path}")
-                self.data = []
+                await self._publish(_EMPTY_INDEX, None)
                 return
 
-            # Check if file has been modified
-            current_mtime = file_path.stat().st_mtime
-            if self.last_mtime is not None and current_mtime == self.last_mtime:
-                return  # File hasn't changed
-
-            # Load the file
-            async with self._lock:
-                with open(file_path, encoding="utf-8") as f:
-                    content = json.load(f)
-                    # Handle both formats: {"acronyms": [...]} or direct list
-                    if isinstance(content, dict) and "acronyms" in content:
-                        self.data = content["acronyms"]
-                    elif isinstance(content, list):
-                        self.data = content
-                    else:
-                        logger.error(f"Invalid JSON format in {self.file_path}")
-                        self.data = []
-
-                self.last_mtime = current_mtime
-                logger.info(f"Loaded {len(self.data)} acronyms from {self.file_path}")
-
-        except json.JSONDecodeError as e:
+            try:
+                # Check if file has been modified. The inode catches replace-by-rename,
+                # and integer nanoseconds avoid float mtime comparisons.
+                st = os.fstat(fd)
+                file_key = (st.st_ino, st.st_mtime_ns)
+                if file_key == self._file_key:
+                    return  # File hasn't changed
+
+                # Parse and index the file in a worker thread so the event loop keeps serving requests
+                index = await asyncio.to_thread(_read_index, fd, st, self.file_path)
+            finally:
+                os.close(fd)
+
+            await self._publish(index, file_key)
+            logger.info(f"Loaded {len(index.data)} acronyms from {self.file_path}")
+
+        except orjson.JSONDecodeError as e:
             logger.error(f"Invalid JSON in {self.file_path}: {e}")
-            self.data = []
+            await self._publish(_EMPTY_INDEX, None)
         except Exception as e:
             logger.error(f"Error loading acronyms: {e}")
-            self.data = []
+            await self._publish(_EMPTY_INDEX, None)
+
+    async def _publish(self, index: _SearchIndex, file_key: Optional[tuple[int, int]]) -> None:
+        """Swap in a new index snapshot together with the file key it was built from."""
+        async with self._lock:
+            self._index, self._file_key = index, file_key
+            # Cached results belong to the previous snapshot
+            self._results_cache.clear()
+
+    async def watch(self, stop_event: Optional[asyncio.Event] = None) -> None:
+        """Reload data whenever the acronyms file changes on disk.
+
+        Runs until stop_event is set. The watcher only makes reloads immediate;
+        search() keeps its debounced file check for changes the watcher can't see.
+
+        Args:
+            stop_event: Event that ends the watch loop when set
+        """
+        await self.load_data()
+
+        # Watch the directory holding the configured path, not a resolved symlink target, and
+        # reload on any change there: swapping a symlink (e.g. a Kubernetes ConfigMap's ..data)
+        # renames a different entry than the glossary's own. load_data() skips unchanged files.
+        # Non-recursive, since with the default relative path that directory is the app root.
+        try:
+            async for _changes in awatch(
+                Path(self.file_path).absolute().parent, stop_event=stop_event, recursive=False
+            ):
+                await self.load_data()
+        except Exception as e:
+            logger.error(f"File watcher stopped, falling back to per-search checks: {e}")
 
     async def search(self, query: str, threshold: float = 80.0, limit: int = 10) -> list[dict[str, Any]]:
         """Search for acronyms with fuzzy matching.
 
         Args:
-            query: Search query
+            query: Search query (at least MIN_QUERY_LENGTH characters)
             threshold: Minimum similarity score (0-100)
             limit: Maximum number of results
 
         Returns:
             List of matching acronyms with scores
         """
-        # Reload data if file has changed
-        await self.load_data()
+        # Every search path is case- and surrounding-whitespace-insensitive, so normalize once.
+        # Empty and single-character queries (common from typeahead clients) match nothing
+        # useful and are answered without touching the index.
+        query_key = query.strip().lower()
+        if len(query_key) < MIN_QUERY_LENGTH:
+            return []
+
+        # Check the file for changes at most every FILE_CHECK_INTERVAL seconds (always, until
+        # something has loaded) instead of stat()ing it on every search. This also runs alongside
+        # the watcher, which misses in-place edits behind a symlink into another directory.
+        now = time.monotonic()
+        if self._file_key is None or now - self._last_file_check >= FILE_CHECK_INTERVAL:
+            self._last_file_check = now
+            await self.load_data()
 
         if not self.data:
             return []
 
-        if not query:
-            return []
+        # Repeated queries are served from the LRU cache. Callers get copies of the result
+        # dicts so mutating a returned item can't corrupt later cache hits.
+        cache_key = (query_key, threshold, limit)
+        cached = self._results_cache.get(cache_key)
+        if cached is not None:
+            self._results_cache.move_to_end(cache_key)
+            return [dict(item) for item in cached]
+
+        results = self._search_index(self._index, query_key, threshold, limit)
+        self._results_cache[cache_key] = results
+        if len(self._results_cache) > RESULTS_CACHE_SIZE:
+            self._results_cache.popitem(last=False)
+        return [dict(item) for item in results]
+
+    @classmethod
+    def _search_index(cls, index: _SearchIndex, query: str, threshold: float, limit: int) -> list[dict[str, Any]]:
+        """Run the exact/prefix/fuzzy search pipeline against one index snapshot.
+
+        The query must already be stripped and lowercased.
+        """
+        data, search_strings, exact_index, sorted_terms, ngram_index, char_masks = index
+
+        # Fast path: exact term hits (score 100) and term prefix hits (score 95, so only
+        # when that meets the threshold)
+        exact_ids = exact_index.get(query, [])
+        if len(exact_ids) >= limit:
+            return [{**data[idx], "score": EXACT_MATCH_SCORE} for idx in exact_ids[:limit]]
+
+        best_scores = dict.fromkeys(exact_ids, EXACT_MATCH_SCORE)
+        if threshold <= PREFIX_MATCH_SCORE:
+            pos = bisect.bisect_left(sorted_terms, (query,))
+            while pos < len(sorted_terms) and sorted_terms[pos][0].startswith(query):
+                best_scores.setdefault(sorted_terms[pos][1], PREFIX_MATCH_SCORE)
+                pos += 1
 
-        results = []
-
-        # Create searchable strings from data
-        searchable_items = []
-        for item in self.data:
-            # Create a searchable string from term and full_name
-            search_str = item.get("term", "")
-            if "full_name" in item:
-                search_str = f"{search_str} {item['full_name']}"
-            searchable_items.append((search_str, item))
-
-        # Perform fuzzy search
-        matches = process.extract(
-            query,
-            [item[0] for item in searchable_items],
+        # Normalize the query the same way the cached strings were, once per search
+        query_processed = default_process(query)
+        if not query_processed:
+            return cls._top_results(data, best_scores, limit)
+
+        # Full-threshold matches, scored in one C-level batch call. score_cutoff lets
+        # rapidfuzz abandon sub-threshold candidates early; they come back as 0.
+        scores = process.cdist(
+            [query_processed],
+            search_strings,
             scorer=fuzz.WRatio,
-            limit=limit,
-        )
+            processor=None,
+            score_cutoff=threshold,
+            dtype=np.float64,
+            workers=-1,
+        )[0]
+        hits = np.flatnonzero(scores)
+        if len(hits) > limit:
+            # Select the top `limit` indices without sorting every candidate
+            hits = hits[np.argpartition(-scores[hits], limit - 1)[:limit]]
+        matches = [(float(scores[idx]), int(idx)) for idx in hits]
+
+        # Partial matches: strings containing the query qualify with a lower floor.
+        # Only those substring candidates are rescored.
+        if threshold > PARTIAL_MATCH_THRESHOLD:
+            if len(query_processed) >= NGRAM_SIZE:
+                # Any string containing the query contains all of its n-grams
+                postings = sorted((ngram_index.get(gram, frozenset()) for gram in _ngrams(query_processed)), key=len)
+                candidate_ids: Iterable[int] = sorted(postings[0].intersection(*postings[1:]))
+            else:
+                # Any string containing the query has all of the query's character bits set
+                query_mask = np.uint64(_char_mask(query_processed))
+                candidate_ids = np.flatnonzero((char_masks & query_mask) == query_mask).tolist()
+            partial_ids = [idx for idx in candidate_ids if not scores[idx] and query_processed in search_strings[idx]]
+            if partial_ids:
+                partial_scores = process.cdist(
+                    [query_processed],
+                    [search_strings[idx] for idx in partial_ids],
+                    scorer=fuzz.WRatio,
+                    processor=None,
+                    score_cutoff=PARTIAL_MATCH_THRESHOLD,
+                    dtype=np.float64,
+                )[0]
+                matches.extend((float(score), idx) for idx, score in zip(partial_ids, partial_scores) if score)
 
-        for match_str, score, idx in matches:
-            if score >= threshold:
-                item = searchable_items[idx][1].copy()
-                item["score"] = score
-                results.append(item)
-            elif query.lower() in match_str.lower() and score >= 60:
-                # Partial match with lower threshold
-                item = searchable_items[idx][1].copy()
-                item["score"] = score
-                results.append(item)
+        # Merge fuzzy matches into the fast-path hits, keeping the higher score per item
+        for score, idx in matches:
+            if score > best_scores.get(idx, 0.0):
+                best_scores[idx] = score
 
-        # Sort by score descending
-        results.sort(key=lambda x: x["score"], reverse=True)
+        return cls._top_results(data, best_scores, limit)
 
-        return results[:limit]
+    @staticmethod
+    def _top_results(data: list[dict[str, Any]], scores: dict[int, float], limit: int) -> list[dict[str, Any]]:
+        """Return the best-scoring items, highest score first."""
+        # Keep the best `limit` matches: O(n log k) instead of a full sort
+        top_matches = heapq.nlargest(limit, scores.items(), key=lambda match: match[1])
+
+        # Materialize result dicts only for the final top-k
+        return [{**data[idx], "score": score} for idx, score in top_matches]
 
     async def get_all(self) -> list[dict[str, Any]]:
         """Get all acronyms."""
         await self.load_data()
         return self.data.copy()
+
+
+@functools.cache
+def get_service(file_path: Optional[str] = None) -> AcronymsService:
+    """Get the shared AcronymsService for a glossary file.
+
+    Tests that need a fresh instance call get_service.cache_clear().
+    """
+    return AcronymsService(file_path)
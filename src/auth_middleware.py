@@ -3,17 +3,90 @@
 Returns HTTP 403 (not 401) to avoid VS Code OAuth popups.
 """
 
+import functools
+import hmac
 import logging
 import os
+from dataclasses import dataclass
+from typing import Optional
 
-from fastapi import Request
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
+# 403 bodies are constant - serialize them once instead of on every rejected request
+_MISSING_KEY_BODY = orjson.dumps({"error": "API key required for MCP access"})
+_INVALID_KEY_BODY = orjson.dumps({"error": "Invalid API key"})
 
-class MCPAuthMiddleware(BaseHTTPMiddleware):
+
+@dataclass(frozen=True)
+class AuthConfig:
+    """MCP authentication settings parsed from MCP_API_KEYS."""
+
+    enabled: bool
+    keys: frozenset[str]
+    key_bytes: tuple[bytes, ...]
+
+    def accepts(self, api_key: bytes) -> bool:
+        """Check a raw X-API-Key header value without leaking, via timing, how much of it matched.
+
+        Every configured key is compared with hmac.compare_digest and the loop never
+        exits early, so the check costs the same whichever key (if any) matches.
+        """
+        valid = False
+        for key in self.key_bytes:
+            valid |= hmac.compare_digest(api_key, key)
+        return valid
+
+
+@functools.lru_cache(maxsize=8)
+def _load_config(keys_str: str) -> AuthConfig:
+    """Parse a comma-separated MCP_API_KEYS value (cached per distinct value)."""
+    keys = frozenset(k.strip() for k in keys_str.split(",") if k.strip())
+    return AuthConfig(enabled=bool(keys_str), keys=keys, key_bytes=tuple(k.encode() for k in sorted(keys)))
+
+
+def get_auth_config() -> AuthConfig:
+    """Get the auth config for the current MCP_API_KEYS value.
+
+    Only the env lookup runs per request; changes to MCP_API_KEYS (e.g. patched
+    in tests) still take effect because the parse cache is keyed on the raw value.
+    """
+    return _load_config(os.getenv("MCP_API_KEYS", ""))
+
+
+def reload_config() -> None:
+    """Drop cached configs so the next request re-parses MCP_API_KEYS."""
+    _load_config.cache_clear()
+
+
+def _find_api_key(scope: Scope) -> Optional[bytes]:
+    """Find the raw X-API-Key value in the ASGI headers.
+
+    ASGI servers lowercase header names, so a plain bytes comparison covers every
+    casing without building Starlette's case-insensitive Headers object. The value
+    stays bytes; it is compared against the pre-encoded keys without decoding.
+    """
+    for name, value in scope["headers"]:
+        if name == b"x-api-key":
+            return value
+    return None
+
+
+async def _send_forbidden(send: Send, body: bytes) -> None:
+    """Send a 403 JSON response - deliberately without a WWW-Authenticate header."""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 403,  # <-- Intentionally NOT 401
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class MCPAuthMiddleware:
     """Middleware to validate API keys for MCP endpoints.
     Returns 403 Forbidden (not 401) to avoid triggering VS Code OAuth popups.
 
@@ -21,43 +94,44 @@ class MCPAuthMiddleware(BaseHTTPMiddleware):
     VS Code's MCP client interprets HTTP 401 as requiring OAuth2/OpenID Connect,
     which triggers unwanted authentication popups. By returning 403 instead,
     we properly deny access without triggering VS Code's OAuth discovery.
+
+    Implemented as plain ASGI rather than BaseHTTPMiddleware: no Request object,
+    no call_next task, and the streaming MCP responses pass through untouched.
     """
 
-    async def dispatch(self, request: Request, call_next):
-        # Only check MCP routes
-        if request.url.path.startswith("/mcp"):
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Check every HTTP request: this middleware only wraps the mounted MCP app, and a path
+        # prefix test would miss /mcp under a root_path (e.g. /api/mcp/)
+        if scope["type"] == "http":
             # Get valid API keys from environment
-            valid_keys_str = os.getenv("MCP_API_KEYS", "")
+            config = get_auth_config()
 
             # If no keys configured, allow access (backward compatibility)
-            if not valid_keys_str:
+            if not config.enabled:
                 logger.debug("No MCP_API_KEYS configured - allowing MCP access")
-                return await call_next(request)
-
-            # Parse valid keys
-            valid_keys = [k.strip() for k in valid_keys_str.split(",") if k.strip()]
+                await self.app(scope, receive, send)
+                return
 
             # Get API key from header
-            api_key = request.headers.get("X-API-Key") or request.headers.get("x-api-key")
+            api_key = _find_api_key(scope)
 
             # Check if key is valid
             if not api_key:
-                logger.warning(f"MCP request to {request.url.path} missing API key")
+                logger.warning(f"MCP request to {scope['path']} missing API key")
                 # CRITICAL: Return 403 (not 401) to avoid VS Code OAuth popup
-                return JSONResponse(
-                    status_code=403,  # <-- Intentionally NOT 401
-                    content={"error": "API key required for MCP access"},
-                )
+                await _send_forbidden(send, _MISSING_KEY_BODY)
+                return
 
-            if api_key not in valid_keys:
-                logger.warning(f"Invalid MCP API key attempted: {api_key[:6]}...")
+            if not config.accepts(api_key):
+                logger.warning(f"Invalid MCP API key attempted: {api_key[:6].decode('latin-1')}...")
                 # CRITICAL: Return 403 (not 401) - see comment above
-                return JSONResponse(
-                    status_code=403,  # <-- Intentionally NOT 401
-                    content={"error": "Invalid API key"},
-                )
+                await _send_forbidden(send, _INVALID_KEY_BODY)
+                return
 
             # Valid key - allow request
-            logger.debug(f"Valid MCP API key accepted: {api_key[:6]}...")
+            logger.debug(f"Valid MCP API key accepted: {api_key[:6].decode('latin-1')}...")
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
@@ -7,35 +7,51 @@ This implementation demonstrates modern MCP best practices:
 - API key management suitable for small teams without Azure AD overhead
 """
 
+import asyncio
 import logging
 import os
-import socket
-import time
+import signal
+import sys
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
-from typing import Any
+from typing import Any, Optional
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values, load_dotenv
 from fastapi import FastAPI, HTTPException, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, RedirectResponse, Response
 from pydantic import BaseModel, Field
+from starlette.types import Receive, Scope, Send
 
-from .acronyms_service import AcronymsService
-from .auth_middleware import MCPAuthMiddleware
-from .mcp_service import get_mcp_app
+from .auth_middleware import reload_config
+from .mcp_service import APP_VERSION, acronyms_service, get_mcp_app, health_json, initialize_mcp_service
 
-# Load environment variables
-load_dotenv()
+# Settings reload_env() re-reads from .env on SIGHUP; everything else applies at startup only
+RELOADABLE_ENV_KEYS = ("MCP_API_KEYS",)
+
+
+def _load_env_file(dotenv_path: Optional[str] = None) -> frozenset[str]:
+    """Fill in unset variables from .env and return the reloadable keys .env manages.
+
+    Variables from the real process environment always win over .env. A reloadable key
+    counts as managed by .env unless the real environment set it to a different value.
+    With ENV=prod, deployments set variables directly and .env is not read at all.
+    """
+    if os.getenv("ENV", "dev") == "prod":
+        return frozenset()
+    load_dotenv(dotenv_path)
+    values = dotenv_values(dotenv_path)
+    return frozenset(key for key in RELOADABLE_ENV_KEYS if os.environ.get(key) in (None, values.get(key)))
+
+
+# Load environment variables from .env (development only - production sets them directly)
+_dotenv_keys = _load_env_file()
 
 # Configure logging
 logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 logger = logging.getLogger(__name__)
 
-# Track application start time
-APP_START_TIME = time.time()
-APP_VERSION = "1.0.0"
-
 
 class SearchResponse(BaseModel):
     """Response model for search endpoint."""
@@ -52,24 +68,77 @@ class HealthResponse(BaseModel):
     hostname: str
     uptime: float
     version: str
+    service: str
+
+
+class RESTGZipMiddleware(GZipMiddleware):
+    """GZip compression for REST responses only.
 
+    MCP responses are streamed as server-sent events, which gzip buffering would
+    hold back, so /mcp requests bypass compression. The path includes any root_path
+    the app is served under (e.g. /api/mcp/), so the prefix is compared against it.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(scope.get("root_path", "") + "/mcp"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
 
-# Initialize the acronyms service for REST API
-acronyms_service = AcronymsService()
 
 # Get MCP app
 mcp_app = get_mcp_app()
 
 
+def reload_env(dotenv_path: Optional[str] = None) -> None:
+    """Re-read the reloadable settings from .env and drop cached MCP auth config.
+
+    Rotated API keys apply without a restart. Only keys managed by .env change: one
+    removed from .env is unset, and values from the real environment are never replaced.
+    """
+    if _dotenv_keys:
+        values = dotenv_values(dotenv_path)
+        for key in _dotenv_keys:
+            value = values.get(key)
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    reload_config()
+    logger.info("Reloaded environment and MCP API keys")
+
+
+def _install_sighup_handler() -> bool:
+    """Bind reload_env to SIGHUP where supported (POSIX, main thread only)."""
+    if not hasattr(signal, "SIGHUP"):
+        return False
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_env)
+    except (NotImplementedError, RuntimeError, ValueError):
+        # e.g. lifespan running outside the main thread under TestClient
+        return False
+    return True
+
+
 @asynccontextmanager
 async def combined_lifespan(app) -> AsyncGenerator[None, None]:
     """Combined lifespan for FastAPI and MCP"""
     # Start MCP lifespan
     async with mcp_app.lifespan(app):
-        # Initialize acronyms service
-        await acronyms_service.load_data()
+        # Load the shared acronyms service (REST and MCP use the same instance)
+        # and watch the glossary file for changes
+        await initialize_mcp_service()
+        stop_watching = asyncio.Event()
+        watch_task = asyncio.create_task(acronyms_service.watch(stop_watching))
+        sighup_installed = _install_sighup_handler()
         logger.info("Siemens Acronyms Server started")
-        yield
+        try:
+            yield
+        finally:
+            if sighup_installed:
+                asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+            stop_watching.set()
+            await watch_task
 
 
 # Create FastAPI app with combined lifespan
@@ -78,6 +147,7 @@ app = FastAPI(
     description="REST and MCP endpoints for searching Siemens terminology",
     version=APP_VERSION,
     lifespan=combined_lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -89,10 +159,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add proven MCP authentication middleware (HTTP 403 for VS Code compatibility)
-app.add_middleware(MCPAuthMiddleware)
+# Compress larger REST responses (e.g. search results); small ones aren't worth the CPU
+app.add_middleware(RESTGZipMiddleware, minimum_size=1024)
 
-# Mount MCP server
+# Mount MCP server (get_mcp_app installs the HTTP 403 MCPAuthMiddleware on it)
 app.mount("/mcp", mcp_app)
 
 
@@ -108,25 +178,25 @@ async def redirect_to_docs(request: Request) -> RedirectResponse:
 
 
 @app.get("/health", response_model=HealthResponse)
-async def health_check() -> HealthResponse:
-    """Health check endpoint."""
-    return HealthResponse(
-        status="healthy",
-        hostname=socket.gethostname(),
-        uptime=time.time() - APP_START_TIME,
-        version=APP_VERSION,
-    )
+async def health_check() -> Response:
+    """Health check endpoint.
+
+    Returns the pre-serialized payload directly, skipping response-model validation
+    on this frequently polled probe. HealthResponse still documents the schema.
+    """
+    return Response(content=health_json(), media_type="application/json")
 
 
 @app.get("/api/v1/search", response_model=SearchResponse)
-async def rest_search_acronyms(q: str = Query(..., min_length=1, description="Search query")) -> SearchResponse:
+async def rest_search_acronyms(q: str = Query(..., min_length=1, description="Search query")) -> ORJSONResponse:
     """Search for acronyms with fuzzy matching.
 
     This is the public REST endpoint - no authentication required.
+    Results are serialized directly; SearchResponse only documents the schema.
     """
     try:
         results = await acronyms_service.search(q)
-        return SearchResponse(results=results, query=q, count=len(results))
+        return ORJSONResponse({"results": results, "query": q, "count": len(results)})
     except Exception as e:
         logger.error(f"Search error: {e}")
         raise HTTPException(
@@ -135,8 +205,21 @@ async def rest_search_acronyms(q: str = Query(..., min_length=1, description="Se
         ) from e
 
 
-# MCP authentication is now handled natively by FastMCP's StaticTokenVerifier
+# MCP endpoint is handled by the mounted FastMCP app at /mcp, behind MCPAuthMiddleware
+# All JSON-RPC protocol details are handled automatically by FastMCP
 
 
-# MCP endpoint is now handled by the mounted FastMCP app at /mcp
-# All JSON-RPC protocol details are handled automatically by FastMCP
+if __name__ == "__main__":
+    import uvicorn
+
+    # uvloop + httptools (both shipped with uvicorn[standard]); uvloop is not available on Windows.
+    # Single worker by default: MCP streamable-HTTP sessions live in the worker's memory, so with
+    # several workers a follow-up request landing on another worker is rejected as an unknown session.
+    uvicorn.run(
+        "src.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=int(os.getenv("WORKERS", "1")),
+    )
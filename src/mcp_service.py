@@ -4,30 +4,61 @@ HTTP 403 authentication for VS Code compatibility.
 """
 
 import functools
-import json
 import logging
 import socket
 import time
+from typing import Any
 
+import orjson
 from fastmcp import FastMCP
+from starlette.middleware import Middleware
 
-from .acronyms_service import AcronymsService
+from .acronyms_service import get_service
+from .auth_middleware import MCPAuthMiddleware
 
 logger = logging.getLogger(__name__)
-APP_START_TIME = time.time()
+# Monotonic clock: uptime can't jump with NTP or manual wall-clock changes
+APP_START_MONO = time.monotonic()
 APP_VERSION = "1.0.0"
 
+# Everything in the health payload except uptime is constant for the process lifetime,
+# so it is serialized once; each call only formats the uptime float and closes the object
+_HEALTH_PREFIX = orjson.dumps(
+    {
+        "status": "healthy",
+        "hostname": socket.gethostname(),
+        "version": APP_VERSION,
+        "service": "siemens-acronyms-mcp",
+    }
+)[:-1] + b',"uptime":'
+
+
+def _dumps(payload: dict[str, Any]) -> str:
+    """Serialize a tool response with orjson, like the REST endpoint's ORJSONResponse.
+
+    Glossary data is parsed with orjson too, so everything it loads serializes back.
+    """
+    return orjson.dumps(payload).decode()
+
+
+def health_json() -> bytes:
+    """Serialized health status shared by the get_health tool and the REST /health route."""
+    return _HEALTH_PREFIX + orjson.dumps(time.monotonic() - APP_START_MONO) + b"}"
+
+
 # Create FastMCP instance - authentication handled by middleware
 mcp = FastMCP(name="siemens-glossary")
 
 # Initialize the acronyms service
-acronyms_service = AcronymsService()
+acronyms_service = get_service()
 
 
 @mcp.tool()
 async def search_acronyms(query: str) -> str:
     """Search for Siemens acronyms and terminology with fuzzy matching.
 
+    Queries shorter than 2 characters return no results.
+
     Args:
         query: The term or acronym to search for
 
@@ -41,7 +72,7 @@ async def search_acronyms(query: str) -> str:
             "query": query,
             "count": len(results)
         }
-        return json.dumps(response)
+        return _dumps(response)
     except Exception as e:
         logger.error(f"Search error in MCP tool: {e}")
         error_response = {
@@ -50,7 +81,7 @@ async def search_acronyms(query: str) -> str:
             "results": [],
             "count": 0
         }
-        return json.dumps(error_response)
+        return _dumps(error_response)
 
 
 @mcp.tool()
@@ -60,14 +91,7 @@ async def get_health() -> str:
     Returns:
         JSON string with health status data
     """
-    health_data = {
-        "status": "healthy",
-        "hostname": socket.gethostname(),
-        "uptime": time.time() - APP_START_TIME,
-        "version": APP_VERSION,
-        "service": "siemens-acronyms-mcp"
-    }
-    return json.dumps(health_data)
+    return health_json().decode()
 
 
 @functools.lru_cache(maxsize=1)
@@ -76,8 +100,12 @@ def get_mcp_app() -> object:
 
     This uses the proven working HTTP transport from code-buddy, not SSE.
     FastMCP handles all HTTP JSON-RPC protocol details automatically.
+
+    The proven MCP authentication middleware (HTTP 403 for VS Code compatibility)
+    is attached here, once, so REST routes never pass through it and re-importing
+    src.main (e.g. as __main__ and again by uvicorn) can't install it twice.
     """
-    return mcp.http_app(path="/")
+    return mcp.http_app(path="/", middleware=[Middleware(MCPAuthMiddleware)])
 
 
 async def initialize_mcp_service() -> None:
@@ -0,0 +1,45 @@
+"""Shared pytest fixtures."""
+
+import pytest
+from fastapi.testclient import TestClient
+from pytest_asyncio import is_async_test
+
+try:
+    import uvloop
+except ImportError:  # Not available on Windows - keep pytest-asyncio's default loop
+    uvloop = None
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test in one session-wide event loop instead of a new loop per test"""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
+if uvloop is not None:
+
+    @pytest.fixture(scope="session")
+    def event_loop_policy():
+        """Run async tests on uvloop, like the server does"""
+        return uvloop.EventLoopPolicy()
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The FastAPI app, imported once per session.
+
+    src.auth_middleware reads MCP_API_KEYS per request (get_auth_config) rather
+    than at import, so one app serves tests that set different keys.
+    """
+    from src.main import app
+
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    """Session-wide test client - the lifespan (data load, file watcher) runs once for all tests"""
+    with TestClient(app) as c:
+        yield c
@@ -11,10 +11,13 @@ Tests only the essential integration points without protocol simulation:
 No complex protocol simulation, session management, or JSON-RPC testing.
 """
 
-import json
+import asyncio
+import contextlib
 import os
-from unittest.mock import patch
+import time
+from typing import Optional
 
+import orjson
 import pytest
 
 
@@ -42,7 +45,6 @@ class TestMCPToolsExist:
 class TestMCPToolsWork:
     """Test that MCP tools work when called directly - no protocol needed"""
 
-    @pytest.mark.asyncio
     async def test_search_acronyms_works(self):
         """Test search_acronyms tool function directly"""
         from src.mcp_service import search_acronyms
@@ -52,13 +54,12 @@ class TestMCPToolsWork:
 
         # Validate result structure
         assert isinstance(result, str)
-        data = json.loads(result)
+        data = orjson.loads(result)
         assert "results" in data
         assert "query" in data
         assert "count" in data
         assert data["query"] == "EDA"
 
-    @pytest.mark.asyncio
     async def test_get_health_works(self):
         """Test get_health tool function directly"""
         from src.mcp_service import get_health
@@ -68,7 +69,7 @@ class TestMCPToolsWork:
 
         # Validate result structure
         assert isinstance(result, str)
-        data = json.loads(result)
+        data = orjson.loads(result)
         assert "status" in data
         assert "hostname" in data
         assert "uptime" in data
@@ -86,10 +87,8 @@ class TestMCPIntegration:
         mcp_app = get_mcp_app()
         assert mcp_app is not None
 
-    def test_main_app_uses_mcp(self):
+    def test_main_app_uses_mcp(self, app):
         """Test that main app integrates MCP properly"""
-        from src.main import app
-
         # Check that MCP endpoint is mounted
         routes = [route.path for route in app.routes if hasattr(route, 'path')]
         assert any(path.startswith("/mcp") for path in routes)
@@ -102,11 +101,11 @@ class TestMCPIntegration:
         middleware = MCPAuthMiddleware(None)
         assert middleware is not None
 
-        # Test that main.py imports it (integration point)
-        with open("src/main.py") as f:
-            content = f.read()
-            assert "from .auth_middleware import MCPAuthMiddleware" in content
-            assert "app.add_middleware(MCPAuthMiddleware)" in content
+        # Test that the mounted MCP app has it installed exactly once (integration point)
+        from src.mcp_service import get_mcp_app
+
+        installed = [m.cls for m in get_mcp_app().user_middleware]
+        assert installed.count(MCPAuthMiddleware) == 1
 
     def test_acronyms_service_loads(self):
         """Test that acronyms service loads data"""
@@ -128,19 +127,20 @@ class TestMCPIntegration:
 class TestMCPAuthenticationLogic:
     """Test auth middleware logic - no protocol simulation"""
 
-    def test_no_api_keys_allows_access(self):
+    def test_no_api_keys_allows_access(self, monkeypatch):
         """Test that no API keys configured allows access"""
         from src.auth_middleware import MCPAuthMiddleware
 
         # When no MCP_API_KEYS, should allow access
-        with patch.dict(os.environ, {}, clear=True):
-            middleware = MCPAuthMiddleware(None)
-            # This is just testing the logic exists - full test would need request simulation
-            assert middleware is not None
+        monkeypatch.delenv("MCP_API_KEYS", raising=False)
+        middleware = MCPAuthMiddleware(None)
+        # This is just testing the logic exists - full test would need request simulation
+        assert middleware is not None
 
-    @patch.dict(os.environ, {"MCP_API_KEYS": "test-key-123"})
-    def test_api_keys_configured_requires_validation(self):
+    def test_api_keys_configured_requires_validation(self, monkeypatch):
         """Test that configured API keys trigger validation"""
+        monkeypatch.setenv("MCP_API_KEYS", "test-key-123")
+
         from src.auth_middleware import MCPAuthMiddleware
 
         middleware = MCPAuthMiddleware(None)
@@ -148,10 +148,361 @@ class TestMCPAuthenticationLogic:
         assert middleware is not None
 
         # Test the key parsing logic
-        import os
-        keys_str = os.getenv("MCP_API_KEYS", "")
-        valid_keys = [k.strip() for k in keys_str.split(",") if k.strip()]
-        assert "test-key-123" in valid_keys
+        from src.auth_middleware import get_auth_config
+
+        config = get_auth_config()
+        assert config.enabled
+        assert "test-key-123" in config.keys
+
+
+class TestEnvFile:
+    """Test .env loading precedence and the SIGHUP reload of rotated keys"""
+
+    @pytest.fixture(autouse=True)
+    def clean_env(self, monkeypatch):
+        """Start without the variables .env sets here; monkeypatch restores them afterwards"""
+        for key in ("MCP_API_KEYS", "LOG_LEVEL"):
+            monkeypatch.setenv(key, "")
+            monkeypatch.delenv(key)
+        monkeypatch.setenv("ENV", "dev")
+
+    def test_real_environment_beats_env_file(self, tmp_path, monkeypatch):
+        """Exported variables win over .env (e.g. one copied from env.example)"""
+        from src import main
+        from src.auth_middleware import get_auth_config
+
+        env_file = tmp_path / ".env"
+        env_file.write_text("MCP_API_KEYS=sk-team-A,sk-team-B\nLOG_LEVEL=DEBUG\n")
+        monkeypatch.setenv("MCP_API_KEYS", "real-secret")
+
+        assert main._load_env_file(str(env_file)) == frozenset()
+        assert os.environ["MCP_API_KEYS"] == "real-secret"
+        assert os.environ["LOG_LEVEL"] == "DEBUG"  # unset variables are still filled in
+        assert not get_auth_config().accepts(b"sk-team-A")
+
+    def test_env_file_ignored_in_prod(self, tmp_path, monkeypatch):
+        """With ENV=prod, .env is neither loaded at startup nor re-read on reload"""
+        from src import main
+
+        env_file = tmp_path / ".env"
+        env_file.write_text("MCP_API_KEYS=sk-team-A\nLOG_LEVEL=DEBUG\n")
+        monkeypatch.setenv("ENV", "prod")
+
+        monkeypatch.setattr(main, "_dotenv_keys", main._load_env_file(str(env_file)))
+        main.reload_env(str(env_file))
+        assert "MCP_API_KEYS" not in os.environ
+        assert "LOG_LEVEL" not in os.environ
+
+    def test_reload_env_rotates_and_clears_keys(self, tmp_path, monkeypatch):
+        """reload_env applies edited keys from .env, and unsets keys removed from it"""
+        from src import main
+        from src.auth_middleware import get_auth_config
+
+        env_file = tmp_path / ".env"
+        env_file.write_text("MCP_API_KEYS=old-key\n")
+        monkeypatch.setattr(main, "_dotenv_keys", main._load_env_file(str(env_file)))
+        assert get_auth_config().accepts(b"old-key")
+
+        env_file.write_text("MCP_API_KEYS=new-key\nLOG_LEVEL=DEBUG\n")
+        main.reload_env(str(env_file))
+        assert get_auth_config().accepts(b"new-key")
+        assert not get_auth_config().accepts(b"old-key")
+        assert "LOG_LEVEL" not in os.environ  # only reloadable keys change
+
+        env_file.write_text("")
+        main.reload_env(str(env_file))
+        assert "MCP_API_KEYS" not in os.environ
+        assert not get_auth_config().enabled
+
+    def test_reload_env_keeps_real_environment(self, tmp_path, monkeypatch):
+        """A key exported in the real environment is not replaced by .env on reload"""
+        from src import main
+        from src.auth_middleware import get_auth_config
+
+        env_file = tmp_path / ".env"
+        env_file.write_text("MCP_API_KEYS=sk-team-A\n")
+        monkeypatch.setenv("MCP_API_KEYS", "real-secret")
+        monkeypatch.setattr(main, "_dotenv_keys", main._load_env_file(str(env_file)))
+
+        main.reload_env(str(env_file))
+        assert os.environ["MCP_API_KEYS"] == "real-secret"
+        assert not get_auth_config().accepts(b"sk-team-A")
+
+
+def _write_glossary(path, terms):
+    """Write a minimal glossary file with one entry per term"""
+    path.write_bytes(orjson.dumps([{"term": t, "full_name": f"{t} Full Name", "description": t} for t in terms]))
+
+
+class TestIndexCache:
+    """Test the pickled index cache kept in INDEX_CACHE_DIR"""
+
+    @pytest.fixture
+    def cache_dir(self, tmp_path, monkeypatch):
+        """Enable the index cache in a directory separate from the glossary"""
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        monkeypatch.setenv("INDEX_CACHE_DIR", str(cache_dir))
+        return cache_dir
+
+    async def test_cache_disabled_by_default(self, tmp_path, monkeypatch):
+        """Without INDEX_CACHE_DIR nothing is written, in particular next to the glossary"""
+        from src.acronyms_service import AcronymsService
+
+        monkeypatch.delenv("INDEX_CACHE_DIR", raising=False)
+        glossary = tmp_path / "glossary.json"
+        _write_glossary(glossary, ["EDA"])
+        await AcronymsService(str(glossary)).load_data()
+        assert os.listdir(tmp_path) == ["glossary.json"]
+
+    async def test_cache_hit_skips_index_build(self, tmp_path, cache_dir, monkeypatch):
+        """A second cold start with an unchanged file is served from the cache"""
+        from src import acronyms_service
+        from src.acronyms_service import AcronymsService
+
+        glossary = tmp_path / "glossary.json"
+        _write_glossary(glossary, ["EDA", "PLM"])
+        await AcronymsService(str(glossary)).load_data()
+        assert (cache_dir / "glossary.cache.pkl").exists()
+
+        def fail_build(_data):
+            raise AssertionError("index rebuilt despite a valid cache")
+
+        monkeypatch.setattr(acronyms_service, "_build_index", fail_build)
+        service = AcronymsService(str(glossary))
+        await service.load_data()
+        assert [item["term"] for item in service.data] == ["EDA", "PLM"]
+
+    async def test_stale_cache_ignored_when_content_changes(self, tmp_path, cache_dir):
+        """Same size and mtime but different content must not reuse the old index"""
+        from src.acronyms_service import AcronymsService
+
+        glossary = tmp_path / "glossary.json"
+        _write_glossary(glossary, ["EDA"])
+        st = os.stat(glossary)
+        await AcronymsService(str(glossary)).load_data()
+
+        _write_glossary(glossary, ["PLM"])
+        os.utime(glossary, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert os.stat(glossary).st_size == st.st_size
+
+        service = AcronymsService(str(glossary))
+        await service.load_data()
+        assert [item["term"] for item in service.data] == ["PLM"]
+
+    async def test_unreadable_cache_falls_back_to_parsing(self, tmp_path, cache_dir):
+        """A corrupt cache file is ignored and the glossary is parsed normally"""
+        from src.acronyms_service import AcronymsService
+
+        glossary = tmp_path / "glossary.json"
+        _write_glossary(glossary, ["EDA"])
+        (cache_dir / "glossary.cache.pkl").write_bytes(b"not a pickle")
+
+        service = AcronymsService(str(glossary))
+        await service.load_data()
+        assert [item["term"] for item in service.data] == ["EDA"]
+
+    async def test_failed_cache_write_keeps_index(self, tmp_path, cache_dir, monkeypatch):
+        """A cache write error of any kind leaves the glossary loaded and no temp file behind"""
+        import pickle
+
+        from src.acronyms_service import AcronymsService
+
+        def fail_dump(*_args, **_kwargs):
+            raise pickle.PicklingError("cannot pickle")
+
+        monkeypatch.setattr(pickle, "dump", fail_dump)
+        glossary = tmp_path / "glossary.json"
+        _write_glossary(glossary, ["EDA"])
+
+        service = AcronymsService(str(glossary))
+        await service.load_data()
+        assert [item["term"] for item in service.data] == ["EDA"]
+        assert os.listdir(cache_dir) == []
+
+
+SEARCH_GLOSSARY = [
+    {"term": "EDA", "full_name": "Electronic Design Automation"},
+    {"term": "Simcenter", "full_name": "Simulation portfolio"},
+    {"term": "SIMATIC", "full_name": "Siemens Automation"},
+    {"term": "TIA", "full_name": "Totally Integrated Automation portal for engineering widgets and controllers"},
+    {"term": "PLM", "full_name": "Product Lifecycle Management"},
+]
+
+
+@pytest.fixture
+def search_service(tmp_path):
+    """AcronymsService over a small fixed glossary (no file watcher)"""
+    from src.acronyms_service import AcronymsService
+
+    glossary = tmp_path / "glossary.json"
+    glossary.write_bytes(orjson.dumps(SEARCH_GLOSSARY))
+    return AcronymsService(str(glossary))
+
+
+class TestAcronymsSearch:
+    """Test the exact/prefix/fuzzy/substring search pipeline at the service level"""
+
+    async def test_exact_term_hit_is_case_insensitive(self, search_service):
+        """Exact term matches score 100 whatever the query's case"""
+        from src.acronyms_service import EXACT_MATCH_SCORE
+
+        for query in ("eda", "EDA", " Eda "):
+            results = await search_service.search(query)
+            assert results[0]["term"] == "EDA"
+            assert results[0]["score"] == EXACT_MATCH_SCORE
+
+    async def test_prefix_hits_respect_threshold(self, search_service):
+        """Prefix hits score 95, so they are only returned when the threshold allows it"""
+        from src.acronyms_service import PREFIX_MATCH_SCORE
+
+        results = await search_service.search("sim")
+        assert {r["term"] for r in results if r["score"] == PREFIX_MATCH_SCORE} == {"Simcenter", "SIMATIC"}
+
+        results = await search_service.search("sim", threshold=99)
+        assert all(r["score"] != PREFIX_MATCH_SCORE for r in results)
+
+    @pytest.mark.parametrize("query", ["wi", "widgets"])
+    async def test_substring_fallback(self, search_service, query):
+        """Substring matches below the threshold are returned for 2-char and n-gram-sized queries"""
+        from src.acronyms_service import PARTIAL_MATCH_THRESHOLD
+
+        results = await search_service.search(query)
+        assert [r["term"] for r in results] == ["TIA"]
+        assert PARTIAL_MATCH_THRESHOLD <= results[0]["score"] < 80
+
+    @pytest.mark.parametrize("query", ["", " ", "e", " e "])
+    async def test_queries_under_two_characters_return_nothing(self, search_service, query):
+        """Empty and single-character queries (after stripping) never match"""
+        assert await search_service.search(query) == []
+
+    async def test_unmatched_query_returns_nothing(self, search_service):
+        """A query sharing nothing with the glossary returns no results"""
+        assert await search_service.search("qz") == []
+
+
+class TestSearchResultsCache:
+    """Test the per-index LRU cache of search results"""
+
+    async def test_mutating_results_does_not_corrupt_cache(self, tmp_path):
+        """Items returned from a cache hit are copies, not the cached dicts"""
+        from src.acronyms_service import AcronymsService
+
+        glossary = tmp_path / "glossary.json"
+        _write_glossary(glossary, ["EDA", "PLM"])
+        service = AcronymsService(str(glossary))
+
+        first = await service.search("EDA")
+        first[0]["term"] = "MUTATED"
+        second = await service.search("EDA")
+        second[0]["term"] = "MUTATED"
+
+        assert (await service.search("EDA"))[0]["term"] == "EDA"
+
+    async def test_cache_cleared_after_reload(self, search_service):
+        """A reloaded glossary is searched afresh instead of serving cached results"""
+        assert (await search_service.search("EDA"))[0]["full_name"] == "Electronic Design Automation"
+
+        glossary = search_service.file_path
+        replacement = f"{glossary}.new"
+        with open(replacement, "wb") as f:
+            f.write(orjson.dumps([{"term": "EDA", "full_name": "Renamed"}]))
+        os.replace(replacement, glossary)  # new inode, so the change is always detected
+        await search_service.load_data()
+
+        assert (await search_service.search("EDA"))[0]["full_name"] == "Renamed"
+
+    async def test_file_check_is_debounced(self, search_service):
+        """Searches re-check the file at most every FILE_CHECK_INTERVAL seconds"""
+        from src.acronyms_service import FILE_CHECK_INTERVAL
+
+        await search_service.search("EDA")  # first search always loads
+
+        replacement = f"{search_service.file_path}.new"
+        with open(replacement, "wb") as f:
+            f.write(orjson.dumps([{"term": "EDA", "full_name": "Renamed"}]))
+        os.replace(replacement, search_service.file_path)
+
+        # Within the interval the change is not picked up yet
+        assert (await search_service.search("EDA"))[0]["full_name"] == "Electronic Design Automation"
+
+        # Once the interval has passed, the next search reloads
+        search_service._last_file_check -= FILE_CHECK_INTERVAL
+        assert (await search_service.search("EDA"))[0]["full_name"] == "Renamed"
+
+
+@contextlib.asynccontextmanager
+async def _watching(service):
+    """Run service.watch() in the background until the block exits"""
+    stop = asyncio.Event()
+    task = asyncio.create_task(service.watch(stop))
+    await _wait_for(lambda: service.data)
+    await asyncio.sleep(0.2)  # let awatch register the directory before files change
+    try:
+        yield
+    finally:
+        stop.set()
+        await task
+
+
+async def _wait_for(predicate, timeout=5.0):
+    """Poll predicate until it is true, failing after timeout seconds"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met before timeout"
+        await asyncio.sleep(0.05)
+
+
+class TestFileWatcher:
+    """Test that watch() reloads the glossary as soon as it changes on disk"""
+
+    @staticmethod
+    def _terms(service):
+        return [item["term"] for item in service.data]
+
+    async def test_in_place_write_reloads(self, tmp_path):
+        """Rewriting the file in place (same inode) is picked up"""
+        from src.acronyms_service import AcronymsService
+
+        glossary = tmp_path / "glossary.json"
+        _write_glossary(glossary, ["AAA"])
+        service = AcronymsService(str(glossary))
+
+        async with _watching(service):
+            _write_glossary(glossary, ["BBB"])
+            await _wait_for(lambda: self._terms(service) == ["BBB"])
+
+    async def test_replace_by_rename_reloads(self, tmp_path):
+        """Atomically renaming a new file over the glossary is picked up"""
+        from src.acronyms_service import AcronymsService
+
+        glossary = tmp_path / "glossary.json"
+        _write_glossary(glossary, ["AAA"])
+        service = AcronymsService(str(glossary))
+
+        async with _watching(service):
+            replacement = tmp_path / "glossary.json.new"
+            _write_glossary(replacement, ["BBB"])
+            os.replace(replacement, glossary)
+            await _wait_for(lambda: self._terms(service) == ["BBB"])
+
+    async def test_symlink_swap_reloads(self, tmp_path):
+        """Swapping a directory symlink, as Kubernetes does for ConfigMaps, is picked up every time"""
+        from src.acronyms_service import AcronymsService
+
+        for version, term in (("v1", "AAA"), ("v2", "BBB"), ("v3", "CCC")):
+            (tmp_path / version).mkdir()
+            _write_glossary(tmp_path / version / "glossary.json", [term])
+        (tmp_path / "..data").symlink_to("v1")
+        glossary = tmp_path / "glossary.json"
+        glossary.symlink_to(os.path.join("..data", "glossary.json"))
+        service = AcronymsService(str(glossary))
+
+        async with _watching(service):
+            for version, term in (("v2", "BBB"), ("v3", "CCC")):
+                (tmp_path / "..data_tmp").symlink_to(version)
+                os.replace(tmp_path / "..data_tmp", tmp_path / "..data")
+                await _wait_for(lambda term=term: self._terms(service) == [term])
 
 
 # ============================================================================
@@ -159,13 +510,9 @@ class TestMCPAuthenticationLogic:
 # ============================================================================
 
 @pytest.fixture
-def simple_client():
-    """Simple test client - no complex lifespan needed for basic tests"""
-    from fastapi.testclient import TestClient
-
-    from src.main import app
-
-    return TestClient(app)
+def simple_client(client):
+    """Simple test client - shares the session client from conftest.py"""
+    return client
 
 
 def test_mcp_endpoint_exists(simple_client):
@@ -176,23 +523,71 @@ def test_mcp_endpoint_exists(simple_client):
     assert response.status_code != 404
 
 
-@patch.dict(os.environ, {"MCP_API_KEYS": "test-key"})
-def test_mcp_auth_blocks_missing_key(simple_client):
+def test_mcp_auth_blocks_missing_key(simple_client, monkeypatch):
     """Test that auth middleware blocks requests without API key"""
+    monkeypatch.setenv("MCP_API_KEYS", "test-key")
     response = simple_client.post("/mcp", json={})
     # Should be 403 when API keys configured but none provided
     assert response.status_code == 403
 
 
-@patch.dict(os.environ, {"MCP_API_KEYS": "test-key"})
-def test_mcp_auth_allows_valid_key(simple_client):
+def test_mcp_auth_allows_valid_key(simple_client, monkeypatch):
     """Test that auth middleware allows valid API key"""
+    monkeypatch.setenv("MCP_API_KEYS", "test-key")
     headers = {"X-API-Key": "test-key"}
     response = simple_client.post("/mcp", json={}, headers=headers)
     # Should not be 403 (auth passed) - protocol errors (400) are fine
     assert response.status_code != 403
 
 
+def test_rest_responses_are_gzipped(simple_client):
+    """Large REST responses are compressed for clients that accept gzip"""
+    response = simple_client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+
+
+async def _gzip_encoding(path: str, root_path: str = "") -> Optional[bytes]:
+    """Send a 2 KB response through RESTGZipMiddleware; return its content-encoding, if any"""
+    from src.main import RESTGZipMiddleware
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"x" * 2048})
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "root_path": root_path,
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    await RESTGZipMiddleware(app, minimum_size=1024)(scope, receive, send)
+    return dict(messages[0]["headers"]).get(b"content-encoding")
+
+
+@pytest.mark.parametrize(
+    "path,root_path,encoding",
+    [
+        ("/api/v1/search", "", b"gzip"),
+        ("/mcp/", "", None),
+        ("/api/api/v1/search", "/api", b"gzip"),
+        ("/api/mcp/", "/api", None),
+    ],
+)
+async def test_gzip_skips_only_mcp(path, root_path, encoding):
+    """Responses over minimum_size are gzipped except MCP streams, also under a root_path"""
+    assert await _gzip_encoding(path, root_path) == encoding
+
+
 # ============================================================================
 # REMOVE ALL THE OVER-ENGINEERED PROTOCOL SIMULATION TESTS
 # ============================================================================
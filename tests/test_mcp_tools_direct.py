@@ -5,20 +5,20 @@ Tests the 2 MCP tools that wrap the API endpoints:
 - search_acronyms tool (wraps /api/v1/search)
 - get_health tool (wraps /health)
 """
-import json
-import os
+import asyncio
 
+import orjson
 import pytest
 
 
 class TestMCPToolsDirect:
     """Test MCP tools directly without HTTP protocol complexity"""
 
-    def setup_method(self):
-        """Set up test environment"""
-        os.environ["MCP_API_KEYS"] = "test-direct"
+    @pytest.fixture(autouse=True)
+    def api_keys(self, monkeypatch):
+        """Set up test environment (restored after each test)"""
+        monkeypatch.setenv("MCP_API_KEYS", "test-direct")
 
-    @pytest.mark.asyncio
     async def test_search_acronyms_tool(self):
         """Test search_acronyms MCP tool directly"""
         from src.mcp_service import search_acronyms
@@ -28,7 +28,7 @@ class TestMCPToolsDirect:
 
         # Validate result is JSON string
         assert isinstance(result, str)
-        data = json.loads(result)
+        data = orjson.loads(result)
 
         # Validate structure
         assert "results" in data
@@ -38,19 +38,24 @@ class TestMCPToolsDirect:
         assert isinstance(data["results"], list)
         assert isinstance(data["count"], int)
 
-    @pytest.mark.asyncio
+    def test_search_acronyms_matches_rest_body(self, client):
+        """The tool's JSON is byte-for-byte the REST search response (both serialized by orjson)"""
+        from src.mcp_service import search_acronyms
+
+        rest_body = client.get("/api/v1/search", params={"q": "EDA"}).text
+        assert asyncio.run(search_acronyms.fn("EDA")) == rest_body
+
     async def test_search_acronyms_empty_query(self):
         """Test search_acronyms with empty query"""
         from src.mcp_service import search_acronyms
 
         result = await search_acronyms.fn("")
-        data = json.loads(result)
+        data = orjson.loads(result)
 
         assert data["query"] == ""
         assert data["count"] == 0
         assert data["results"] == []
 
-    @pytest.mark.asyncio
     async def test_get_health_tool(self):
         """Test get_health MCP tool directly"""
         from src.mcp_service import get_health
@@ -59,7 +64,7 @@ class TestMCPToolsDirect:
 
         # Validate result is JSON string
         assert isinstance(result, str)
-        data = json.loads(result)
+        data = orjson.loads(result)
 
         # Validate health structure
         assert "status" in data
@@ -72,14 +77,13 @@ class TestMCPToolsDirect:
         assert isinstance(data["uptime"], (int, float))
         assert data["service"] == "siemens-acronyms-mcp"
 
-    @pytest.mark.asyncio
     async def test_search_acronyms_error_handling(self):
         """Test search_acronyms error handling"""
         from src.mcp_service import search_acronyms
 
         # Should not raise exceptions, should return error in JSON
         result = await search_acronyms.fn("test-query")
-        data = json.loads(result)
+        data = orjson.loads(result)
 
         # Should always have these fields even on error
         assert "query" in data